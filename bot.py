@@ -2,15 +2,17 @@ import logging
 from telegram import Update, ParseMode, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import Updater, CommandHandler, MessageHandler, Filters, CallbackContext, CallbackQueryHandler
 import pytz
-from datetime import datetime, timedelta, calendar
+from datetime import datetime, time as dt_time, timedelta
 import threading
 import re
-from collections import defaultdict
-import uuid
+import base64
 import sqlite3
-from typing import Dict, List, Optional, Tuple
-from functools import wraps
-from nlp_parser import ReminderParser
+import queue
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from functools import lru_cache, wraps
+from nlp_parser import ReminderParser, parse_date_string, parse_time_string
 import time
 import os
 from dotenv import load_dotenv
@@ -26,6 +28,8 @@ if not TELEGRAM_BOT_TOKEN:
 
 MAX_REMINDERS_PER_USER = int(os.getenv('MAX_REMINDERS_PER_USER', '50'))
 DEFAULT_TIMEZONE = os.getenv('DEFAULT_TIMEZONE', 'UTC')
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '4'))
+BOT_WORKERS = int(os.getenv('BOT_WORKERS', '8'))
 
 # Enable logging
 logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
@@ -43,6 +47,77 @@ class ReminderLimitError(ReminderError):
     """User has reached their reminder limit"""
     pass
 
+# Connection settings: WAL lets readers proceed while a timer writes
+DB_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-20000',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA busy_timeout=20000',
+)
+
+def _apply_pragmas(conn: sqlite3.Connection):
+    for pragma in DB_PRAGMAS:
+        conn.execute(pragma)
+
+def _create_connection() -> sqlite3.Connection:
+    """Open a database connection configured for reuse across threads"""
+    conn = sqlite3.connect('bot.db', timeout=20, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    _apply_pragmas(conn)
+    return conn
+
+# Pool of reusable database connections, created lazily up to DB_POOL_SIZE
+_pool: queue.LifoQueue = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+_pool_lock = threading.Lock()
+_pool_created = 0
+
+def _acquire_connection() -> sqlite3.Connection:
+    global _pool_created
+    while True:
+        try:
+            return _pool.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with _pool_lock:
+            create = _pool_created < DB_POOL_SIZE
+            if create:
+                # Count the slot before connecting so other threads cannot overshoot
+                _pool_created += 1
+        
+        if create:
+            try:
+                return _create_connection()
+            except sqlite3.Error:
+                _discard_slot()
+                raise
+        
+        # Wake up periodically in case a slot was freed by a failed or dropped connection
+        try:
+            return _pool.get(timeout=1)
+        except queue.Empty:
+            continue
+
+def _discard_slot():
+    """Give back a pool slot whose connection could not be created"""
+    global _pool_created
+    with _pool_lock:
+        _pool_created -= 1
+
+def _release_connection(conn: sqlite3.Connection, broken: bool = False):
+    if broken:
+        # Drop connections that could not be rolled back cleanly; the next
+        # acquire opens a replacement in the freed slot
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        _discard_slot()
+        return
+    _pool.put(conn)
+
 def safe_db_operation(func):
     """Decorator for safe database operations with retries"""
     @wraps(func)
@@ -51,20 +126,47 @@ def safe_db_operation(func):
         last_error = None
         
         for attempt in range(max_retries):
+            conn = None
+            broken = False
             try:
-                with sqlite3.connect('bot.db', timeout=20) as conn:
-                    conn.row_factory = sqlite3.Row
+                conn = _acquire_connection()
+                # Commits on success and rolls back on error
+                with conn:
                     return func(conn, *args, **kwargs)
             except sqlite3.Error as e:
                 last_error = e
+                broken = conn is not None and conn.in_transaction
                 if attempt < max_retries - 1:
                     logger.warning(f"Database operation failed (attempt {attempt + 1}): {e}")
                     time.sleep(0.1 * (attempt + 1))
                     continue
                 logger.error(f"Database operation failed after {max_retries} attempts: {e}")
                 raise DatabaseError(f"Database operation failed: {str(e)}")
+            finally:
+                if conn is not None:
+                    _release_connection(conn, broken)
     return wrapper
 
+def _to_epoch(value: datetime) -> int:
+    """Convert an aware datetime to the unix timestamp stored in reminder_time"""
+    return int(value.timestamp())
+
+# Bind datetimes as unix timestamps in every query
+sqlite3.register_adapter(datetime, _to_epoch)
+
+@lru_cache(maxsize=1024)
+def _tz(name: str) -> pytz.BaseTzInfo:
+    """Get the pytz timezone object for a name, loading each zone once"""
+    return pytz.timezone(name)
+
+def _from_epoch(timestamp: int, timezone: str) -> datetime:
+    """Convert a stored unix timestamp to an aware datetime in the user's timezone"""
+    return datetime.fromtimestamp(timestamp, _tz(timezone))
+
+def _new_reminder_id() -> str:
+    """Generate an 8-character reminder ID carrying 40 random bits"""
+    return base64.b32encode(os.urandom(5)).decode('ascii').lower()
+
 @safe_db_operation
 def get_user_timezone(conn, user_id: int) -> Optional[str]:
     c = conn.cursor()
@@ -72,6 +174,26 @@ def get_user_timezone(conn, user_id: int) -> Optional[str]:
     result = c.fetchone()
     return result['timezone'] if result else None
 
+# Cache of user_id -> (timezone name, tz object), invalidated by set_user_timezone
+_tz_cache: Dict[int, Tuple[str, pytz.BaseTzInfo]] = {}
+
+def get_user_timezone_cached(user_id: int) -> Optional[Tuple[str, pytz.BaseTzInfo]]:
+    """Get the user's timezone name and tz object, querying the database only on a miss"""
+    cached = _tz_cache.get(user_id)
+    if cached is None:
+        timezone = get_user_timezone(user_id)
+        if not timezone:
+            return None
+        cached = _tz_cache[user_id] = (timezone, _tz(timezone))
+    return cached
+
+def _remember_user_timezone(user_id: int, timezone: str) -> pytz.BaseTzInfo:
+    """Seed the timezone cache from a row that already carries the user's timezone"""
+    cached = _tz_cache.get(user_id)
+    if cached is None:
+        cached = _tz_cache[user_id] = (timezone, _tz(timezone))
+    return cached[1]
+
 @safe_db_operation
 def set_user_timezone(conn, user_id: int, timezone: str):
     c = conn.cursor()
@@ -82,47 +204,58 @@ def set_user_timezone(conn, user_id: int, timezone: str):
             timezone = excluded.timezone,
             last_active_at = CURRENT_TIMESTAMP
     ''', (user_id, timezone))
+    conn.commit()
+    _tz_cache.pop(user_id, None)
 
 @safe_db_operation
-def save_reminder(conn, user_id: int, reminder_id: str, message: str, reminder_time: datetime, 
-                 priority: str = 'medium', recurrence_type: str = None, 
-                 recurrence_interval: int = None, parent_id: str = None) -> bool:
-    c = conn.cursor()
+def save_reminders_bulk(conn, user_id: int, rows: List[Tuple]) -> int:
+    """Insert several reminders for one user in a single transaction.
     
-    # Check user's reminder limit
-    c.execute('SELECT reminder_count, max_reminders FROM users WHERE user_id = ?', (user_id,))
-    user = c.fetchone()
-    if not user:
-        raise DatabaseError("User not found")
+    Each row is (id, user_id, message, reminder_time, priority, recurrence_type,
+    recurrence_interval, parent_id).
+    """
+    if not rows:
+        return 0
     
-    if user['reminder_count'] >= user['max_reminders']:
-        raise ReminderLimitError(f"Maximum number of reminders ({user['max_reminders']}) reached")
+    c = conn.cursor()
     
-    c.execute(
+    # Each row is inserted only while the user is below their limit; later rows
+    # see the earlier ones, so the check and the insert can never be split
+    c.executemany(
         '''INSERT INTO reminders 
            (id, user_id, message, reminder_time, priority, recurrence_type, 
             recurrence_interval, parent_reminder_id) 
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-        (reminder_id, user_id, message, reminder_time.isoformat(), priority,
-         recurrence_type, recurrence_interval, parent_id)
+           SELECT ?, ?, ?, ?, ?, ?, ?, ?
+           WHERE (SELECT COUNT(*) FROM reminders WHERE user_id = ? AND status = 'pending')
+                 < (SELECT max_reminders FROM users WHERE user_id = ?)''',
+        [row + (user_id, user_id) for row in rows]
     )
-    return True
+    
+    if c.rowcount != len(rows):
+        # Raising rolls back the rows that did fit
+        c.execute('SELECT max_reminders FROM users WHERE user_id = ?', (user_id,))
+        user = c.fetchone()
+        if not user:
+            raise DatabaseError("User not found")
+        raise ReminderLimitError(f"Maximum number of reminders ({user['max_reminders']}) reached")
+    return c.rowcount
 
 @safe_db_operation
 def get_user_reminders(conn, user_id: int) -> List[Dict]:
     c = conn.cursor()
     c.execute('''
-        SELECT id, message, reminder_time, status, priority, 
-               recurrence_type, recurrence_interval 
-        FROM reminders 
-        WHERE user_id = ? AND status = 'pending'
-        ORDER BY reminder_time ASC
+        SELECT r.id, r.message, r.reminder_time, r.status, r.priority, 
+               r.recurrence_type, r.recurrence_interval, u.timezone 
+        FROM reminders r 
+        JOIN users u ON r.user_id = u.user_id 
+        WHERE r.user_id = ? AND r.status = 'pending'
+        ORDER BY r.reminder_time ASC
     ''', (user_id,))
     
     return [{
         'id': row['id'],
         'message': row['message'],
-        'time': datetime.fromisoformat(row['reminder_time']),
+        'time': _from_epoch(row['reminder_time'], row['timezone']),
         'status': row['status'],
         'priority': row['priority'],
         'recurrence_type': row['recurrence_type'],
@@ -156,6 +289,72 @@ def mark_reminder_complete(conn, reminder_id: str) -> bool:
     ''', (reminder_id,))
     return c.rowcount > 0
 
+@safe_db_operation
+def advance_recurrence(conn, parent_id: str, next_id: str, user_id: int, message: str,
+                       next_time: datetime, priority: str, recurrence_type: str,
+                       recurrence_interval: int) -> bool:
+    """Complete a recurring reminder and insert its next occurrence in one transaction.
+    
+    Returns False without inserting if the reminder is no longer pending, e.g. it was
+    cancelled after being picked up for sending.
+    """
+    c = conn.cursor()
+    c.execute('BEGIN IMMEDIATE')
+    c.execute('''
+        UPDATE reminders 
+        SET status = 'completed' 
+        WHERE id = ? AND status = 'pending'
+    ''', (parent_id,))
+    if c.rowcount == 0:
+        return False
+    
+    c.execute(
+        '''INSERT INTO reminders 
+           (id, user_id, message, reminder_time, priority, recurrence_type, 
+            recurrence_interval, parent_reminder_id) 
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+        (next_id, user_id, message, next_time, priority,
+         recurrence_type, recurrence_interval, parent_id)
+    )
+    return True
+
+@safe_db_operation
+def complete_reminders_bulk(conn, reminder_ids: List[str], next_rows: List[Tuple]) -> int:
+    """Complete several reminders and insert their next occurrences in one transaction.
+    
+    Each next row is (id, user_id, message, reminder_time, priority, recurrence_type,
+    recurrence_interval, parent_id). No limit check is made because every row
+    replaces a reminder that is being completed.
+    """
+    c = conn.cursor()
+    c.executemany('''
+        UPDATE reminders 
+        SET status = 'completed' 
+        WHERE id = ? AND status = 'pending'
+    ''', [(reminder_id,) for reminder_id in reminder_ids])
+    
+    if next_rows:
+        c.executemany(
+            '''INSERT INTO reminders 
+               (id, user_id, message, reminder_time, priority, recurrence_type, 
+                recurrence_interval, parent_reminder_id) 
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            next_rows
+        )
+    return len(next_rows)
+
+def _pending_reminder_from_row(row: sqlite3.Row) -> Dict:
+    return {
+        'id': row['id'],
+        'user_id': row['user_id'],
+        'message': row['message'],
+        'time': _from_epoch(row['reminder_time'], row['timezone']),
+        'timezone': row['timezone'],
+        'priority': row['priority'],
+        'recurrence_type': row['recurrence_type'],
+        'recurrence_interval': row['recurrence_interval']
+    }
+
 @safe_db_operation
 def get_all_pending_reminders(conn) -> List[Dict]:
     c = conn.cursor()
@@ -168,47 +367,76 @@ def get_all_pending_reminders(conn) -> List[Dict]:
         ORDER BY r.reminder_time ASC
     ''')
     
-    return [{
-        'id': row['id'],
-        'user_id': row['user_id'],
-        'message': row['message'],
-        'time': datetime.fromisoformat(row['reminder_time']),
-        'timezone': row['timezone'],
-        'priority': row['priority'],
-        'recurrence_type': row['recurrence_type'],
-        'recurrence_interval': row['recurrence_interval']
-    } for row in c.fetchall()]
+    return [_pending_reminder_from_row(row) for row in c.fetchall()]
+
+@safe_db_operation
+def get_missed_pending(conn, now: datetime) -> List[Dict]:
+    """Get pending reminders that were due before now"""
+    c = conn.cursor()
+    c.execute('''
+        SELECT r.id, r.user_id, r.message, r.reminder_time, u.timezone,
+               r.priority, r.recurrence_type, r.recurrence_interval
+        FROM reminders r 
+        JOIN users u ON r.user_id = u.user_id 
+        WHERE r.status = 'pending' AND r.reminder_time < ?
+        ORDER BY r.reminder_time ASC
+    ''', (now,))
+    
+    return [_pending_reminder_from_row(row) for row in c.fetchall()]
+
+@safe_db_operation
+def get_future_pending(conn, now: datetime) -> List[Dict]:
+    """Get pending reminders due at or after now"""
+    c = conn.cursor()
+    c.execute('''
+        SELECT r.id, r.user_id, r.message, r.reminder_time, u.timezone,
+               r.priority, r.recurrence_type, r.recurrence_interval
+        FROM reminders r 
+        JOIN users u ON r.user_id = u.user_id 
+        WHERE r.status = 'pending' AND r.reminder_time >= ?
+        ORDER BY r.reminder_time ASC
+    ''', (now,))
+    
+    return [_pending_reminder_from_row(row) for row in c.fetchall()]
 
 @safe_db_operation
 def cleanup_old_reminders(conn, days: int = 30) -> int:
     """Clean up old completed/cancelled reminders"""
     c = conn.cursor()
-    cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+    cutoff_date = datetime.now(pytz.UTC) - timedelta(days=days)
     
     c.execute('''
         DELETE FROM reminders 
         WHERE status IN ('completed', 'cancelled') 
         AND reminder_time < ?
     ''', (cutoff_date,))
+    deleted = c.rowcount
     
-    return c.rowcount
+    # Return freed pages to the filesystem (commits the delete first);
+    # executescript steps the pragma until every page is released
+    if deleted:
+        c.executescript('PRAGMA incremental_vacuum(1000);')
+    
+    return deleted
 
 @safe_db_operation
 def get_reminder_by_id(conn, reminder_id: str, user_id: int = None) -> Optional[Dict]:
     c = conn.cursor()
     if user_id:
         c.execute('''
-            SELECT id, message, reminder_time, priority, recurrence_type, 
-                   recurrence_interval, status
-            FROM reminders 
-            WHERE id = ? AND user_id = ? AND status = 'pending'
+            SELECT r.id, r.message, r.reminder_time, r.priority, r.recurrence_type, 
+                   r.recurrence_interval, r.status, u.timezone
+            FROM reminders r 
+            JOIN users u ON r.user_id = u.user_id 
+            WHERE r.id = ? AND r.user_id = ? AND r.status = 'pending'
         ''', (reminder_id, user_id))
     else:
         c.execute('''
-            SELECT id, message, reminder_time, priority, recurrence_type, 
-                   recurrence_interval, status
-            FROM reminders 
-            WHERE id = ? AND status = 'pending'
+            SELECT r.id, r.message, r.reminder_time, r.priority, r.recurrence_type, 
+                   r.recurrence_interval, r.status, u.timezone
+            FROM reminders r 
+            JOIN users u ON r.user_id = u.user_id 
+            WHERE r.id = ? AND r.status = 'pending'
         ''', (reminder_id,))
     
     row = c.fetchone()
@@ -218,7 +446,7 @@ def get_reminder_by_id(conn, reminder_id: str, user_id: int = None) -> Optional[
     return {
         'id': row['id'],
         'message': row['message'],
-        'time': datetime.fromisoformat(row['reminder_time']),
+        'time': _from_epoch(row['reminder_time'], row['timezone']),
         'priority': row['priority'] or 'medium',
         'recurrence_type': row['recurrence_type'],
         'recurrence_interval': row['recurrence_interval'],
@@ -237,9 +465,6 @@ def update_reminder(conn, reminder_id: str, user_id: int = None, **updates) -> b
     for key, value in updates.items():
         if value is not None:
             set_clauses.append(f"{key} = ?")
-            # Convert datetime to ISO format for storage
-            if isinstance(value, datetime):
-                value = value.isoformat()
             values.append(value)
     
     if not set_clauses:
@@ -261,8 +486,130 @@ def update_reminder(conn, reminder_id: str, user_id: int = None, **updates) -> b
     
     return c.rowcount > 0
 
-# Dictionary to store active reminder timers
-active_reminders: Dict[str, threading.Timer] = {}
+# Static statements for the single-field edits made from inline buttons
+_UPD_PRIO = "UPDATE reminders SET priority = ? WHERE id = ? AND status = 'pending'"
+_UPD_PRIO_WITH_USER = (
+    "UPDATE reminders SET priority = ? WHERE id = ? AND user_id = ? AND status = 'pending'"
+)
+_UPD_RECUR = (
+    "UPDATE reminders SET recurrence_type = ?, recurrence_interval = ? "
+    "WHERE id = ? AND status = 'pending'"
+)
+_UPD_RECUR_WITH_USER = (
+    "UPDATE reminders SET recurrence_type = ?, recurrence_interval = ? "
+    "WHERE id = ? AND user_id = ? AND status = 'pending'"
+)
+
+@safe_db_operation
+def update_reminder_priority(conn, reminder_id: str, priority: str, user_id: int = None) -> bool:
+    c = conn.cursor()
+    if user_id:
+        c.execute(_UPD_PRIO_WITH_USER, (priority, reminder_id, user_id))
+    else:
+        c.execute(_UPD_PRIO, (priority, reminder_id))
+    return c.rowcount > 0
+
+@safe_db_operation
+def update_reminder_recurrence(conn, reminder_id: str, recurrence_type: Optional[str],
+                               recurrence_interval: Optional[int], user_id: int = None) -> bool:
+    """Set or clear (with None) a reminder's recurrence"""
+    c = conn.cursor()
+    if user_id:
+        c.execute(_UPD_RECUR_WITH_USER, (recurrence_type, recurrence_interval, reminder_id, user_id))
+    else:
+        c.execute(_UPD_RECUR, (recurrence_type, recurrence_interval, reminder_id))
+    return c.rowcount > 0
+
+class ReminderScheduler:
+    """Fires reminders from a single thread using a heap ordered by due time.
+    
+    Due callbacks run on the given executor so a slow send or database write
+    never delays the reminders queued behind it.
+    """
+    
+    def __init__(self, executor: ThreadPoolExecutor):
+        self.executor = executor
+        self.heap: List[Tuple[float, str]] = []
+        self.entries: Dict[str, Tuple[float, Callable, tuple]] = {}
+        self.cv = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name='reminder-scheduler', daemon=True)
+    
+    def start(self):
+        self.thread.start()
+    
+    def add(self, due: float, reminder_id: str, callback: Callable, args: tuple = ()):
+        """Schedule callback(*args) at the given epoch time, replacing any earlier entry"""
+        with self.cv:
+            self.entries[reminder_id] = (due, callback, args)
+            heapq.heappush(self.heap, (due, reminder_id))
+            # Only wake the worker if this is now the earliest reminder
+            if self.heap[0][1] == reminder_id:
+                self.cv.notify()
+    
+    def add_many(self, items: List[Tuple[float, str, Callable, tuple]]):
+        """Schedule several (due, reminder_id, callback, args) items under one lock"""
+        if not items:
+            return
+        with self.cv:
+            for due, reminder_id, callback, args in items:
+                self.entries[reminder_id] = (due, callback, args)
+            if len(items) > len(self.heap):
+                # Rebuilding is linear, cheaper than pushing a batch bigger than the heap
+                self.heap.extend((due, reminder_id) for due, reminder_id, _, _ in items)
+                heapq.heapify(self.heap)
+            else:
+                for due, reminder_id, _, _ in items:
+                    heapq.heappush(self.heap, (due, reminder_id))
+            self.cv.notify()
+    
+    def get(self, reminder_id: str) -> Optional[Tuple[float, Callable, tuple]]:
+        """Return the (due, callback, args) entry of a scheduled reminder"""
+        with self.cv:
+            return self.entries.get(reminder_id)
+    
+    def cancel(self, reminder_id: str) -> bool:
+        """Cancel a scheduled reminder; its heap item is skipped when reached"""
+        with self.cv:
+            return self.entries.pop(reminder_id, None) is not None
+    
+    def _next_due(self) -> Tuple[str, Callable, tuple]:
+        with self.cv:
+            while True:
+                if not self.heap:
+                    self.cv.wait()
+                    continue
+                
+                due, reminder_id = self.heap[0]
+                entry = self.entries.get(reminder_id)
+                if entry is None or entry[0] != due:
+                    # Cancelled or rescheduled since this item was pushed
+                    heapq.heappop(self.heap)
+                    continue
+                
+                wait = due - time.time()
+                if wait > 0:
+                    self.cv.wait(timeout=wait)
+                    continue
+                
+                heapq.heappop(self.heap)
+                del self.entries[reminder_id]
+                return reminder_id, entry[1], entry[2]
+    
+    def _fire(self, reminder_id: str, callback: Callable, args: tuple):
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"Error firing reminder {reminder_id}: {str(e)}")
+    
+    def _run(self):
+        while True:
+            reminder_id, callback, args = self._next_due()
+            self.executor.submit(self._fire, reminder_id, callback, args)
+
+# Worker threads that send due reminders and record their database updates
+reminder_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='reminder')
+
+scheduler = ReminderScheduler(reminder_executor)
 
 # Priority emojis
 PRIORITY_EMOJIS = {
@@ -293,10 +640,43 @@ TIMEZONE_SUGGESTIONS = {
     'Asia/Tokyo': '🇯🇵 Tokyo (JST)'
 }
 
+# Reply markups are identical for every user, so build them once
+QUICK_TIME_KEYBOARD = ReplyKeyboardMarkup([
+    [KeyboardButton(QUICK_TIMES['in_1_hour']), KeyboardButton(QUICK_TIMES['in_2_hours'])],
+    [KeyboardButton(QUICK_TIMES['tonight']), KeyboardButton(QUICK_TIMES['tomorrow_morning'])],
+    [KeyboardButton(QUICK_TIMES['tomorrow_afternoon']), KeyboardButton(QUICK_TIMES['this_weekend'])]
+], one_time_keyboard=True)
+
+_TZ_SUGGESTION_KEYS = tuple(TIMEZONE_SUGGESTIONS)[:4]  # Show top 4 suggestions
+
+TIMEZONE_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton(TIMEZONE_SUGGESTIONS[tz], callback_data=f"tz_{tz}")]
+    for tz in _TZ_SUGGESTION_KEYS
+])
+
+_ALL_TZ_SET = frozenset(pytz.all_timezones)
+
+def _build_tz_prefix_index() -> Dict[str, List[str]]:
+    """Map every lowercased prefix of a suggestion's region ('', 'a', 'as', 'asia', ...) to its timezones"""
+    index: Dict[str, List[str]] = {}
+    for timezone in _TZ_SUGGESTION_KEYS:
+        region = timezone.split('/')[0].lower()
+        for end in range(len(region) + 1):
+            index.setdefault(region[:end], []).append(timezone)
+    return index
+
+_TZ_PREFIX_INDEX = _build_tz_prefix_index()
+
 def init_db():
     conn = sqlite3.connect('bot.db')
+    # Only takes effect before the first table is created
+    conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+    _apply_pragmas(conn)
     c = conn.cursor()
     
+    # Create the schema in a single transaction
+    c.execute('BEGIN')
+    
     # Create users table
     c.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -319,6 +699,16 @@ def init_db():
         )
     ''')
     
+    # Index the pending queue by time and each user's active reminders
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_reminders_pending_time 
+        ON reminders(reminder_time) WHERE status = 'pending'
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_reminders_user_status 
+        ON reminders(user_id, status)
+    ''')
+    
     conn.commit()
     conn.close()
 
@@ -342,8 +732,7 @@ def start(update: Update, context: CallbackContext) -> None:
     
     update.message.reply_text(welcome_text, parse_mode=ParseMode.HTML)
 
-def format_command(update: Update, context: CallbackContext) -> None:
-    format_text = """
+FORMAT_TEXT = """
 *Reminder Formats*
 
 1️⃣ *Quick Format:*
@@ -395,83 +784,35 @@ Doctor appointment
 
 Use the ⌨️ Quick Time buttons below for common times!
     """
+
+def format_command(update: Update, context: CallbackContext) -> None:
     update.message.reply_text(
-        format_text, 
+        FORMAT_TEXT, 
         parse_mode=ParseMode.MARKDOWN,
-        reply_markup=get_quick_time_keyboard()
+        reply_markup=QUICK_TIME_KEYBOARD
     )
 
 def timezone_command(update: Update, context: CallbackContext) -> None:
-    keyboard = []
-    for tz, label in list(TIMEZONE_SUGGESTIONS.items())[:4]:  # Show top 4 suggestions
-        keyboard.append([InlineKeyboardButton(label, callback_data=f"tz_{tz}")])
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
     update.message.reply_text(
         "Please select your timezone from these common options, or type a timezone name (e.g., 'Asia/Kolkata'):",
-        reply_markup=reply_markup
+        reply_markup=TIMEZONE_KEYBOARD
     )
 
 def button_callback(update: Update, context: CallbackContext) -> None:
     query = update.callback_query
     query.answer()
+    data = query.data
     
-    if query.data.startswith("tz_"):
-        timezone = query.data[3:]
+    if data.startswith("tz_"):
+        timezone = data[3:]
         user_id = query.from_user.id
         set_user_timezone(user_id, timezone)
         query.edit_message_text(
             f"✅ Time zone set to {timezone} ({TIMEZONE_SUGGESTIONS.get(timezone, '')}).\n\n"
             "You can now set reminders! Use /format to see reminder formats."
         )
-    elif query.data.startswith("edit_"):
-        reminder_id = query.data[5:]
-        reminder = get_reminder_by_id(reminder_id)
-        
-        if not reminder:
-            query.edit_message_text("❌ Reminder not found or already completed.")
-            return
-        
-        # Store the reminder ID in user data for the edit flow
-        context.user_data[query.from_user.id] = {
-            'editing_reminder': reminder_id
-        }
-        
-        # Create edit options keyboard
-        keyboard = [
-            [InlineKeyboardButton("⏰ Change Time", callback_data=f"edit_time_{reminder_id}")],
-            [InlineKeyboardButton("📝 Change Message", callback_data=f"edit_msg_{reminder_id}")],
-            [InlineKeyboardButton("🔄 Change Recurrence", callback_data=f"edit_recur_{reminder_id}")],
-            [InlineKeyboardButton("⭐ Change Priority", callback_data=f"edit_prio_{reminder_id}")],
-            [InlineKeyboardButton("❌ Cancel Editing", callback_data=f"edit_cancel_{reminder_id}")]
-        ]
-        
-        time_str = reminder['time'].strftime('%I:%M %p')
-        date_str = reminder['time'].strftime('%d %b %Y')
-        priority_emoji = PRIORITY_EMOJIS.get(reminder['priority'], '')
-        
-        edit_text = (
-            f"*Editing Reminder*\n\n"
-            f"Current settings:\n"
-            f"🕐 Time: {time_str}\n"
-            f"📅 Date: {date_str}\n"
-            f"{priority_emoji} Priority: {reminder['priority']}\n"
-            f"📝 Message: {reminder['message']}\n"
-        )
-        
-        if reminder['recurrence_type']:
-            edit_text += f"🔄 Repeats: Every {reminder['recurrence_interval']} {reminder['recurrence_type']}(s)\n"
-        
-        edit_text += "\nWhat would you like to change?"
-        
-        query.edit_message_text(
-            edit_text,
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode=ParseMode.MARKDOWN
-        )
-    
-    elif query.data.startswith("edit_time_"):
-        reminder_id = query.data[10:]
+    elif data.startswith("edit_time_"):
+        reminder_id = data[10:]
         context.user_data[query.from_user.id]['edit_action'] = 'time'
         query.edit_message_text(
             "Please send the new time for this reminder in one of these formats:\n"
@@ -480,18 +821,18 @@ def button_callback(update: Update, context: CallbackContext) -> None:
             "• tomorrow 3pm\n"
             "• 25/02/2024 3:00pm\n\n"
             "Or use the quick time buttons below:",
-            reply_markup=get_quick_time_keyboard()
+            reply_markup=QUICK_TIME_KEYBOARD
         )
     
-    elif query.data.startswith("edit_msg_"):
-        reminder_id = query.data[9:]
+    elif data.startswith("edit_msg_"):
+        reminder_id = data[9:]
         context.user_data[query.from_user.id]['edit_action'] = 'message'
         query.edit_message_text(
             "Please send the new message for this reminder."
         )
     
-    elif query.data.startswith("edit_recur_"):
-        reminder_id = query.data[11:]
+    elif data.startswith("edit_recur_"):
+        reminder_id = data[11:]
         keyboard = [
             [InlineKeyboardButton("Daily", callback_data=f"set_recur_{reminder_id}_day_1")],
             [InlineKeyboardButton("Weekly", callback_data=f"set_recur_{reminder_id}_week_1")],
@@ -503,8 +844,8 @@ def button_callback(update: Update, context: CallbackContext) -> None:
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
     
-    elif query.data.startswith("edit_prio_"):
-        reminder_id = query.data[10:]
+    elif data.startswith("edit_prio_"):
+        reminder_id = data[10:]
         keyboard = [
             [InlineKeyboardButton("🔴 High", callback_data=f"set_prio_{reminder_id}_high")],
             [InlineKeyboardButton("🟡 Medium", callback_data=f"set_prio_{reminder_id}_medium")],
@@ -515,12 +856,13 @@ def button_callback(update: Update, context: CallbackContext) -> None:
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
     
-    elif query.data.startswith("set_recur_"):
-        _, reminder_id, rec_type, interval = query.data.split('_')
+    elif data.startswith("set_recur_"):
+        # IDs may contain underscores, so split the known suffix fields from the right
+        reminder_id, rec_type, interval = data[len("set_recur_"):].rsplit('_', 2)
         if rec_type == 'none':
-            success = update_reminder(reminder_id, recurrence_type=None, recurrence_interval=None)
+            success = update_reminder_recurrence(reminder_id, None, None, query.from_user.id)
         else:
-            success = update_reminder(reminder_id, recurrence_type=rec_type, recurrence_interval=int(interval))
+            success = update_reminder_recurrence(reminder_id, rec_type, int(interval), query.from_user.id)
         
         if success:
             reminder = get_reminder_by_id(reminder_id)
@@ -541,33 +883,77 @@ def button_callback(update: Update, context: CallbackContext) -> None:
         else:
             query.edit_message_text("❌ Failed to update reminder. It might have been cancelled or completed.")
     
-    elif query.data.startswith("set_prio_"):
-        _, reminder_id, priority = query.data.split('_')
-        success = update_reminder(reminder_id, priority=priority)
+    elif data.startswith("set_prio_"):
+        reminder_id, priority = data[len("set_prio_"):].rsplit('_', 1)
+        success = update_reminder_priority(reminder_id, priority, query.from_user.id)
         if success:
             query.edit_message_text(f"✅ Priority updated to {PRIORITY_EMOJIS[priority]} {priority}! Use /list to see your reminders.")
         else:
             query.edit_message_text("❌ Failed to update reminder. It might have been cancelled or completed.")
     
-    elif query.data.startswith("edit_cancel_"):
-        reminder_id = query.data[12:]
+    elif data.startswith("edit_cancel_"):
+        reminder_id = data[12:]
         if query.from_user.id in context.user_data:
             context.user_data.pop(query.from_user.id, None)
         query.edit_message_text("✅ Edit cancelled. Use /list to see your reminders.")
     
-    elif query.data.startswith("cancel_"):
-        reminder_id = query.data[7:]
+    # Checked after the longer edit_* prefixes, which it would otherwise swallow
+    elif data.startswith("edit_"):
+        reminder_id = data[5:]
+        reminder = get_reminder_by_id(reminder_id)
+        
+        if not reminder:
+            query.edit_message_text("❌ Reminder not found or already completed.")
+            return
+        
+        # Store the reminder ID in user data for the edit flow
+        context.user_data[query.from_user.id] = {
+            'editing_reminder': reminder_id
+        }
+        
+        # Create edit options keyboard
+        keyboard = [
+            [InlineKeyboardButton("⏰ Change Time", callback_data=f"edit_time_{reminder_id}")],
+            [InlineKeyboardButton("📝 Change Message", callback_data=f"edit_msg_{reminder_id}")],
+            [InlineKeyboardButton("🔄 Change Recurrence", callback_data=f"edit_recur_{reminder_id}")],
+            [InlineKeyboardButton("⭐ Change Priority", callback_data=f"edit_prio_{reminder_id}")],
+            [InlineKeyboardButton("❌ Cancel Editing", callback_data=f"edit_cancel_{reminder_id}")]
+        ]
+        
+        time_str = reminder['time'].strftime('%I:%M %p')
+        date_str = reminder['time'].strftime('%d %b %Y')
+        priority_emoji = PRIORITY_EMOJIS.get(reminder['priority'], '')
+        
+        edit_text = (
+            f"*Editing Reminder*\n\n"
+            f"Current settings:\n"
+            f"🕐 Time: {time_str}\n"
+            f"📅 Date: {date_str}\n"
+            f"{priority_emoji} Priority: {reminder['priority']}\n"
+            f"📝 Message: {reminder['message']}\n"
+        )
+        
+        if reminder['recurrence_type']:
+            edit_text += f"🔄 Repeats: Every {reminder['recurrence_interval']} {reminder['recurrence_type']}(s)\n"
+        
+        edit_text += "\nWhat would you like to change?"
+        
+        query.edit_message_text(
+            edit_text,
+            reply_markup=InlineKeyboardMarkup(keyboard),
+            parse_mode=ParseMode.MARKDOWN
+        )
+    
+    elif data.startswith("cancel_"):
+        reminder_id = data[7:]
         if delete_reminder(reminder_id):
             # Cancel the timer if it exists
-            if reminder_id in active_reminders:
-                active_reminders[reminder_id].cancel()
-                del active_reminders[reminder_id]
+            cancel_scheduled_reminder(reminder_id)
             query.edit_message_text("✅ Reminder cancelled.")
         else:
             query.edit_message_text("❌ Reminder not found or already cancelled.")
 
-def help_command(update: Update, context: CallbackContext) -> None:
-    help_text = """
+HELP_TEXT = """
 🤖 *Dancing Reminder Bot Help*
 
 *Available Commands:*
@@ -617,38 +1003,37 @@ Use the ⌨️ button panel for common times:
 
 Need examples? Type /format to see all formats!
     """
+
+def help_command(update: Update, context: CallbackContext) -> None:
     update.message.reply_text(
-        help_text, 
+        HELP_TEXT, 
         parse_mode=ParseMode.MARKDOWN,
-        reply_markup=get_quick_time_keyboard()
+        reply_markup=QUICK_TIME_KEYBOARD
     )
 
+# Matches the "date: ..." and "time: ..." lines of a structured reminder
+_FIELD_RE = re.compile(r'^(date|time):\s*(.+)$', re.IGNORECASE)
+
 def parse_reminder(text):
     reminders = []
-    current_reminder = defaultdict(str)
+    current_reminder = {}
     
     lines = [line.strip() for line in text.split('\n') if line.strip()]
     
     for line in lines:
-        lower_line = line.lower()
-        if lower_line.startswith('date:'):
-            # If we already have time and message, save the current reminder
-            if current_reminder.get('time') and current_reminder.get('message'):
-                reminders.append(dict(current_reminder))
-                current_reminder.clear()
-            current_reminder['date'] = re.search(r'date:\s*(.+)', line, re.IGNORECASE).group(1).strip()
-        elif lower_line.startswith('time:'):
+        match = _FIELD_RE.match(line)
+        if match:
             # If we already have time and message, save the current reminder
             if current_reminder.get('time') and current_reminder.get('message'):
-                reminders.append(dict(current_reminder))
-                current_reminder.clear()
-            current_reminder['time'] = re.search(r'time:\s*(.+)', line, re.IGNORECASE).group(1).strip()
+                reminders.append(current_reminder)
+                current_reminder = {}
+            current_reminder[match.group(1).lower()] = match.group(2).strip()
         elif current_reminder.get('time'):  # This is a message line
             current_reminder['message'] = current_reminder.get('message', '') + ' ' + line
     
     # Don't forget to add the last reminder
     if current_reminder.get('time') and current_reminder.get('message'):
-        reminders.append(dict(current_reminder))
+        reminders.append(current_reminder)
     
     return reminders
 
@@ -693,10 +1078,14 @@ def cancel_reminder(update: Update, context: CallbackContext) -> None:
         
     reminder_id = context.args[0]
     if delete_reminder(reminder_id):
+        cancel_scheduled_reminder(reminder_id)
         update.message.reply_text(f"✅ Reminder {reminder_id} cancelled.")
     else:
         update.message.reply_text("❌ Reminder not found. Use /list to see your active reminders.")
 
+# Days per month in a common year; February is adjusted for leap years
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
 def calculate_next_occurrence(last_time: datetime, recurrence_type: str, interval: int) -> datetime:
     """Calculate next occurrence properly handling months and DST"""
     if recurrence_type == 'day':
@@ -717,7 +1106,11 @@ def calculate_next_occurrence(last_time: datetime, recurrence_type: str, interva
                 year -= 1
         
         # Handle day overflow (e.g., Jan 31 -> Feb 28)
-        day = min(last_time.day, calendar.monthrange(year, month)[1])
+        if month == 2 and ((year % 4 == 0 and year % 100 != 0) or year % 400 == 0):
+            days_in_month = 29
+        else:
+            days_in_month = _DAYS_IN_MONTH[month - 1]
+        day = min(last_time.day, days_in_month)
         
         # Create new datetime with same time but updated date
         next_time = last_time.replace(year=year, month=month, day=day)
@@ -733,67 +1126,76 @@ def calculate_next_occurrence(last_time: datetime, recurrence_type: str, interva
         
         return next_time
 
-def schedule_reminder(context: CallbackContext, chat_id: int, user_id: int, reminder_id: str, 
+def _scheduler_entry(context: CallbackContext, chat_id: int, user_id: int, reminder_id: str, 
                      reminder_time: datetime, message: str, priority: str = 'medium',
-                     recurrence_type: str = None, recurrence_interval: int = None):
-    """Schedule a reminder with proper timezone and DST handling"""
+                     recurrence_type: str = None, recurrence_interval: int = None,
+                     user_timezone: Optional[pytz.BaseTzInfo] = None,
+                     now: Optional[datetime] = None
+                     ) -> Optional[Tuple[float, str, Callable, tuple]]:
+    """Build a reminder's scheduler item, or None if it is already due"""
     # Ensure the reminder_time has timezone info
     if reminder_time.tzinfo is None:
-        user_timezone = pytz.timezone(get_user_timezone(user_id))
+        if user_timezone is None:
+            _, user_timezone = get_user_timezone_cached(user_id)
         reminder_time = user_timezone.localize(reminder_time)
     
-    # Convert to UTC for delay calculation
-    now_utc = datetime.now(pytz.UTC)
-    reminder_time_utc = reminder_time.astimezone(pytz.UTC)
+    # timestamp() of an aware datetime needs no UTC conversion first;
+    # batch callers pass in a shared now
+    due = reminder_time.timestamp()
+    now_ts = now.timestamp() if now is not None else time.time()
     
-    delay = (reminder_time_utc - now_utc).total_seconds()
-    if delay > 0:
-        timer = threading.Timer(
-            delay,
+    if due > now_ts:
+        return (
+            due,
+            reminder_id,
             send_reminder,
-            args=(context, chat_id, user_id, reminder_id, message, priority, 
-                  recurrence_type, recurrence_interval, reminder_time)
+            (context, chat_id, user_id, reminder_id, message, priority, 
+             recurrence_type, recurrence_interval, reminder_time)
         )
-        
-        # Store timer and metadata
-        active_reminders[reminder_id] = {
-            'timer': timer,
-            'scheduled_time': reminder_time,
-            'user_id': user_id,
-            'chat_id': chat_id,
-            'message': message,
-            'priority': priority,
-            'recurrence_type': recurrence_type,
-            'recurrence_interval': recurrence_interval
-        }
-        
-        timer.start()
+    return None
+
+def schedule_reminder(context: CallbackContext, chat_id: int, user_id: int, reminder_id: str, 
+                     reminder_time: datetime, message: str, priority: str = 'medium',
+                     recurrence_type: str = None, recurrence_interval: int = None,
+                     user_timezone: Optional[pytz.BaseTzInfo] = None):
+    """Schedule a reminder with proper timezone and DST handling"""
+    entry = _scheduler_entry(
+        context, chat_id, user_id, reminder_id, reminder_time, message, priority,
+        recurrence_type, recurrence_interval, user_timezone
+    )
+    if entry:
+        scheduler.add(*entry)
         logger.info(f"Scheduled reminder {reminder_id} for {reminder_time}")
 
+def cancel_scheduled_reminder(reminder_id: str) -> bool:
+    """Stop a scheduled reminder from firing"""
+    return scheduler.cancel(reminder_id)
+
 def reschedule_reminder(context: CallbackContext, reminder_id: str, 
                        new_time: Optional[datetime] = None) -> bool:
     """Reschedule an existing reminder, optionally with a new time"""
-    if reminder_id not in active_reminders:
+    entry = scheduler.get(reminder_id)
+    if entry is None:
         return False
     
-    reminder = active_reminders[reminder_id]
-    reminder['timer'].cancel()
+    # The scheduler entry already carries everything send_reminder needs
+    (_, chat_id, user_id, _, message, priority,
+     recurrence_type, recurrence_interval, scheduled_time) = entry[2]
+    scheduler.cancel(reminder_id)
     
     if new_time:
         scheduled_time = new_time
-    else:
-        scheduled_time = reminder['scheduled_time']
     
     schedule_reminder(
         context,
-        reminder['chat_id'],
-        reminder['user_id'],
+        chat_id,
+        user_id,
         reminder_id,
         scheduled_time,
-        reminder['message'],
-        reminder['priority'],
-        reminder['recurrence_type'],
-        reminder['recurrence_interval']
+        message,
+        priority,
+        recurrence_type,
+        recurrence_interval
     )
     
     return True
@@ -810,10 +1212,6 @@ def send_reminder(context: CallbackContext, chat_id: int, user_id: int, reminder
             text=f"{priority_emoji} Reminder: {message}"
         )
         
-        # Clean up the active reminder
-        if reminder_id in active_reminders:
-            del active_reminders[reminder_id]
-        
         # Handle recurrence
         if recurrence_type:
             # Calculate next occurrence
@@ -825,14 +1223,16 @@ def send_reminder(context: CallbackContext, chat_id: int, user_id: int, reminder
                 return
             
             # Generate new reminder ID for the next occurrence
-            next_reminder_id = str(uuid.uuid4())[:8]
+            next_reminder_id = _new_reminder_id()
             
             try:
-                # Save and schedule next occurrence
-                save_reminder(
-                    user_id, next_reminder_id, message, next_time,
-                    priority, recurrence_type, recurrence_interval, reminder_id
-                )
+                # Complete this occurrence and save the next one together
+                if not advance_recurrence(
+                    reminder_id, next_reminder_id, user_id, message, next_time,
+                    priority, recurrence_type, recurrence_interval
+                ):
+                    logger.info(f"Recurring reminder {reminder_id} was cancelled, not rescheduling")
+                    return
                 
                 schedule_reminder(
                     context, chat_id, user_id, next_reminder_id,
@@ -847,131 +1247,326 @@ def send_reminder(context: CallbackContext, chat_id: int, user_id: int, reminder
                     chat_id=chat_id,
                     text="⚠️ Failed to schedule next occurrence of recurring reminder. Please check /list"
                 )
+                mark_reminder_complete(reminder_id)
+            return
         
         mark_reminder_complete(reminder_id)
         
     except Exception as e:
         logger.error(f"Error sending reminder {reminder_id}: {str(e)}")
-        if reminder_id in active_reminders:
-            del active_reminders[reminder_id]
 
 @safe_db_operation
 def should_create_next_occurrence(conn, reminder_id: str, next_time: datetime) -> bool:
     """Check if we should create the next occurrence of a recurring reminder"""
     c = conn.cursor()
+    # End dates are unix timestamps like reminder_time, so SQLite compares them directly
     c.execute('''
-        SELECT recurrence_end_date 
+        SELECT recurrence_end_date IS NULL OR recurrence_end_date >= ? AS allowed 
         FROM reminders 
         WHERE id = ?
-    ''', (reminder_id,))
+    ''', (next_time, reminder_id))
     
     row = c.fetchone()
-    if not row or not row['recurrence_end_date']:
-        return True
-    
-    end_date = datetime.fromisoformat(row['recurrence_end_date'])
-    return next_time <= end_date
+    return not row or bool(row['allowed'])
+
+def _send_missed_notice(context: CallbackContext, chat_id: int, reminder_time: datetime, message: str):
+    try:
+        context.bot.send_message(
+            chat_id=chat_id,
+            text=f"⚠️ Missed Reminder from {reminder_time.strftime('%d %b %Y %I:%M %p')}:\n{message}"
+        )
+    except Exception as e:
+        logger.error(f"Error sending missed reminder to {chat_id}: {str(e)}")
 
 def handle_missed_reminders(context: CallbackContext):
     """Handle missed reminders with proper timezone handling"""
     now = datetime.now(pytz.UTC)
     try:
-        reminders = get_all_pending_reminders()
+        # Two index range scans split pending reminders around the current time
+        missed = get_missed_pending(now)
+        upcoming = get_future_pending(now)
         
-        for reminder in reminders:
+        next_rows = []
+        entries = []
+        for reminder in missed:
+            user_timezone = _remember_user_timezone(reminder['user_id'], reminder['timezone'])
+            
+            # Stored as epoch seconds, so this is already aware in the user's timezone
             reminder_time = reminder['time']
-            if reminder_time.tzinfo is None:
-                user_timezone = pytz.timezone(reminder['timezone'])
-                reminder_time = user_timezone.localize(reminder_time)
             
-            reminder_time_utc = reminder_time.astimezone(pytz.UTC)
+            # Send missed reminders concurrently on the worker pool
+            reminder_executor.submit(
+                _send_missed_notice, context, reminder['user_id'], reminder_time, reminder['message']
+            )
             
-            if reminder_time_utc < now:
-                # Send missed reminder
-                context.bot.send_message(
-                    chat_id=reminder['user_id'],
-                    text=f"⚠️ Missed Reminder from {reminder_time.strftime('%d %b %Y %I:%M %p')}:\n{reminder['message']}"
+            # Handle recurring reminders
+            if reminder['recurrence_type']:
+                next_time = calculate_next_occurrence(
+                    reminder_time,
+                    reminder['recurrence_type'],
+                    reminder['recurrence_interval']
                 )
                 
-                # Handle recurring reminders
-                if reminder['recurrence_type']:
-                    next_time = calculate_next_occurrence(
-                        reminder_time,
+                if next_time > now and should_create_next_occurrence(reminder['id'], next_time):
+                    # Create next occurrence
+                    next_reminder_id = _new_reminder_id()
+                    next_rows.append((
+                        next_reminder_id,
+                        reminder['user_id'],
+                        reminder['message'],
+                        next_time,
+                        reminder['priority'],
                         reminder['recurrence_type'],
-                        reminder['recurrence_interval']
-                    )
-                    
-                    if next_time > now and should_create_next_occurrence(reminder['id'], next_time):
-                        # Create next occurrence
-                        next_reminder_id = str(uuid.uuid4())[:8]
-                        save_reminder(
-                            reminder['user_id'],
-                            next_reminder_id,
-                            reminder['message'],
-                            next_time,
-                            reminder['priority'],
-                            reminder['recurrence_type'],
-                            reminder['recurrence_interval'],
-                            reminder['id']
-                        )
-                        
-                        schedule_reminder(
-                            context,
-                            reminder['user_id'],
-                            reminder['user_id'],
-                            next_reminder_id,
-                            next_time,
-                            reminder['message'],
-                            reminder['priority'],
-                            reminder['recurrence_type'],
-                            reminder['recurrence_interval']
-                        )
+                        reminder['recurrence_interval'],
+                        reminder['id']
+                    ))
+                    entries.append(_scheduler_entry(
+                        context,
+                        reminder['user_id'],
+                        reminder['user_id'],
+                        next_reminder_id,
+                        next_time,
+                        reminder['message'],
+                        reminder['priority'],
+                        reminder['recurrence_type'],
+                        reminder['recurrence_interval'],
+                        user_timezone,
+                        now
+                    ))
+        
+        # Complete the missed reminders and save their next occurrences in one commit
+        if missed:
+            complete_reminders_bulk([reminder['id'] for reminder in missed], next_rows)
+        
+        for reminder in upcoming:
+            # Schedule future reminder
+            entries.append(_scheduler_entry(
+                context,
+                reminder['user_id'],
+                reminder['user_id'],
+                reminder['id'],
+                reminder['time'],
+                reminder['message'],
+                reminder['priority'],
+                reminder['recurrence_type'],
+                reminder['recurrence_interval'],
+                _remember_user_timezone(reminder['user_id'], reminder['timezone']),
+                now
+            ))
+        
+        entries = [entry for entry in entries if entry]
+        scheduler.add_many(entries)
+        logger.info(f"Scheduled {len(entries)} pending reminders")
+    except Exception as e:
+        logger.error(f"Error handling missed reminders: {str(e)}")
+
+# Quick time buttons relative to now: text -> hours ahead
+_QUICK_TIME_OFFSETS = {
+    QUICK_TIMES['in_1_hour']: 1,
+    QUICK_TIMES['in_2_hours']: 2,
+}
+
+# Quick time buttons at a fixed clock time: text -> (time, days ahead, None for Saturday)
+_QUICK_TIME_FIXED = {
+    QUICK_TIMES['tonight']: (dt_time(20, 0), 0),
+    QUICK_TIMES['tomorrow_morning']: (dt_time(9, 0), 1),
+    QUICK_TIMES['tomorrow_afternoon']: (dt_time(14, 0), 1),
+    QUICK_TIMES['this_weekend']: (dt_time(10, 0), None),
+}
+
+def process_quick_time(text: str, user_timezone: pytz.BaseTzInfo) -> Optional[Dict]:
+    now = datetime.now(user_timezone)
+    
+    hours = _QUICK_TIME_OFFSETS.get(text)
+    if hours is not None:
+        later = now + timedelta(hours=hours)
+        return {'time': later.time(), 'date': later.date()}
+    
+    fixed = _QUICK_TIME_FIXED.get(text)
+    if fixed is None:
+        return None
+    
+    clock, days = fixed
+    if days is None:
+        days = (5 - now.weekday()) % 7  # Days until Saturday
+    return {'time': clock, 'date': now.date() + timedelta(days=days)}
+
+def _handle_edit_input(update: Update, context: CallbackContext, user_id: int, message_text: str) -> bool:
+    """Apply a message sent while editing a reminder, returns False if no edit action is pending"""
+    reminder_id = context.user_data[user_id]['editing_reminder']
+    edit_action = context.user_data[user_id].get('edit_action')
+    reminder = get_reminder_by_id(reminder_id)
+    
+    if not reminder:
+        update.message.reply_text("❌ Reminder not found or already completed.")
+        context.user_data.pop(user_id, None)
+        return True
+    
+    if edit_action == 'message':
+        if update_reminder(reminder_id, message=message_text):
+            update.message.reply_text("✅ Message updated! Use /list to see your reminders.")
+        else:
+            update.message.reply_text("❌ Failed to update reminder.")
+        context.user_data.pop(user_id, None)
+        return True
+    
+    elif edit_action == 'time':
+        try:
+            # Try to parse the new time
+            _, user_timezone = get_user_timezone_cached(user_id)
+            now = datetime.now(user_timezone)
+            
+            # Parse natural language time
+            parsed = ReminderParser.parse_natural_time(message_text, now)
+            new_time = datetime.combine(parsed['date'], parsed['time'])
+            new_time = user_timezone.localize(new_time)
+            
+            if new_time < now:
+                if 'date' not in parsed:  # Only add a day if no specific date was set
+                    new_time += timedelta(days=1)
+            
+            if new_time < now:
+                update.message.reply_text("❌ Cannot set reminder for past time.")
+                return True
+            
+            if update_reminder(reminder_id, reminder_time=new_time):
+                # Reschedule the reminder
+                cancel_scheduled_reminder(reminder_id)
                 
-                mark_reminder_complete(reminder['id'])
-            else:
-                # Schedule future reminder
                 schedule_reminder(
                     context,
-                    reminder['user_id'],
-                    reminder['user_id'],
-                    reminder['id'],
-                    reminder_time,
+                    update.message.chat_id,
+                    user_id,
+                    reminder_id,
+                    new_time,
                     reminder['message'],
                     reminder['priority'],
                     reminder['recurrence_type'],
                     reminder['recurrence_interval']
                 )
-    except Exception as e:
-        logger.error(f"Error handling missed reminders: {str(e)}")
+                
+                update.message.reply_text(
+                    f"✅ Time updated to {new_time.strftime('%I:%M %p on %d %b %Y')}!\n"
+                    "Use /list to see your reminders."
+                )
+            else:
+                update.message.reply_text("❌ Failed to update reminder.")
+        except Exception as e:
+            logger.error(f"Error updating reminder time: {str(e)}")
+            update.message.reply_text(
+                "❌ Invalid time format. Please use formats like:\n"
+                "• 3:00pm\n"
+                "• 15:00\n"
+                "• tomorrow 3pm\n"
+                "• 25/02/2024 3:00pm"
+            )
+        context.user_data.pop(user_id, None)
+        return True
+    
+    return False
 
-def get_quick_time_keyboard():
-    keyboard = [
-        [KeyboardButton(QUICK_TIMES['in_1_hour']), KeyboardButton(QUICK_TIMES['in_2_hours'])],
-        [KeyboardButton(QUICK_TIMES['tonight']), KeyboardButton(QUICK_TIMES['tomorrow_morning'])],
-        [KeyboardButton(QUICK_TIMES['tomorrow_afternoon']), KeyboardButton(QUICK_TIMES['this_weekend'])]
-    ]
-    return ReplyKeyboardMarkup(keyboard, one_time_keyboard=True)
+def _create_reminders(update: Update, context: CallbackContext, user_id: int, message_text: str,
+                      user_timezone: pytz.BaseTzInfo, now: datetime) -> None:
+    """Parse a reminder message, store every reminder in it and schedule them"""
+    try:
+        # Parse natural language if it doesn't follow the structured format
+        if 'time:' not in message_text and 'date:' not in message_text:
+            parsed = ReminderParser.parse_natural_time(message_text, now)
+            message_text = ReminderParser.format_reminder_text(parsed, now.date())
+        
+        reminders = parse_reminder(message_text)
+        if not reminders:
+            raise ValueError("No valid reminders found")
+        
+        new_reminders = []
+        for reminder in reminders:
+            # Parse the time and the date if provided
+            reminder_clock = parse_time_string(reminder['time'])
+            if 'date' in reminder:
+                try:
+                    reminder_date = parse_date_string(reminder['date'])
+                except ValueError:
+                    update.message.reply_text(f"❌ Invalid date format: {reminder['date']}. Use DD/MM/YYYY")
+                    continue
+            else:
+                reminder_date = now.date()
+            
+            reminder_time = datetime.combine(reminder_date, reminder_clock)
+            reminder_time = user_timezone.localize(reminder_time)
+            
+            if reminder_time < now:
+                if 'date' not in reminder:  # Only add a day if no specific date was set
+                    reminder_time += timedelta(days=1)
+            
+            if reminder_time < now:
+                update.message.reply_text(f"❌ Cannot set reminder for past time: {reminder['message']}")
+                continue
+            
+            # Generate unique ID for the reminder
+            reminder_id = _new_reminder_id()
+            
+            # Get priority and recurrence
+            priority = reminder.get('priority', 'medium')
+            recurrence_type = reminder.get('recurrence_type')
+            recurrence_interval = reminder.get('recurrence_interval', 1)
+            
+            new_reminders.append((
+                reminder_id, user_id, reminder['message'], reminder_time,
+                priority, recurrence_type, recurrence_interval, None
+            ))
+        
+        # Store all reminders from this message in one transaction
+        save_reminders_bulk(user_id, new_reminders)
+        
+        for (reminder_id, _, message, reminder_time, priority,
+             recurrence_type, recurrence_interval, _) in new_reminders:
+            # Schedule the reminder
+            schedule_reminder(
+                context,
+                update.message.chat_id,
+                user_id,
+                reminder_id,
+                reminder_time,
+                message,
+                priority,
+                recurrence_type,
+                recurrence_interval,
+                user_timezone
+            )
+            
+            # Format response
+            priority_emoji = PRIORITY_EMOJIS.get(priority, '')
+            date_str = reminder_time.strftime('%d %b %Y')
+            time_str = reminder_time.strftime('%I:%M %p')
+            
+            response = f"{priority_emoji} Reminder set for {date_str} at {time_str}:\n{message}"
+            
+            if recurrence_type:
+                response += f"\n🔄 Repeats every {recurrence_interval} {recurrence_type}(s)"
+            
+            response += f"\nID: `{reminder_id}`"
+            
+            update.message.reply_text(
+                response,
+                parse_mode=ParseMode.MARKDOWN
+            )
+    
+    except Exception as e:
+        logger.error(f"Error setting reminder: {str(e)}")
+        update.message.reply_text(
+            "❌ Error setting reminder. Use /format to see the correct format."
+        )
 
-def process_quick_time(text: str, user_timezone: datetime) -> Optional[Dict]:
-    now = datetime.now(user_timezone)
+def _handle_quick_time_followup(update: Update, context: CallbackContext, user_id: int, message_text: str,
+                                user_timezone: pytz.BaseTzInfo, now: datetime) -> None:
+    """Turn the message sent after a quick time button into a reminder"""
+    quick_time = context.user_data[user_id].pop('quick_time')
+    reminder_text = f"reminder\ntime: {quick_time['time'].strftime('%I:%M%p')}\n"
+    if quick_time['date'] != now.date():
+        reminder_text += f"date: {quick_time['date'].strftime('%d/%m/%Y')}\n"
+    reminder_text += message_text
     
-    if text == QUICK_TIMES['in_1_hour']:
-        return {'time': (now + timedelta(hours=1)).time(), 'date': now.date()}
-    elif text == QUICK_TIMES['in_2_hours']:
-        return {'time': (now + timedelta(hours=2)).time(), 'date': now.date()}
-    elif text == QUICK_TIMES['tonight']:
-        return {'time': datetime.strptime('8:00PM', '%I:%M%p').time(), 'date': now.date()}
-    elif text == QUICK_TIMES['tomorrow_morning']:
-        return {'time': datetime.strptime('9:00AM', '%I:%M%p').time(), 
-                'date': (now + timedelta(days=1)).date()}
-    elif text == QUICK_TIMES['tomorrow_afternoon']:
-        return {'time': datetime.strptime('2:00PM', '%I:%M%p').time(), 
-                'date': (now + timedelta(days=1)).date()}
-    elif text == QUICK_TIMES['this_weekend']:
-        days_until_saturday = (5 - now.weekday()) % 7
-        return {'time': datetime.strptime('10:00AM', '%I:%M%p').time(), 
-                'date': (now + timedelta(days=days_until_saturday)).date()}
-    return None
+    _create_reminders(update, context, user_id, reminder_text, user_timezone, now)
 
 def handle_message(update: Update, context: CallbackContext) -> None:
     user_id = update.message.from_user.id
@@ -979,82 +1574,13 @@ def handle_message(update: Update, context: CallbackContext) -> None:
     
     # Check if user is in edit mode
     if user_id in context.user_data and 'editing_reminder' in context.user_data[user_id]:
-        reminder_id = context.user_data[user_id]['editing_reminder']
-        edit_action = context.user_data[user_id].get('edit_action')
-        reminder = get_reminder_by_id(reminder_id)
-        
-        if not reminder:
-            update.message.reply_text("❌ Reminder not found or already completed.")
-            context.user_data.pop(user_id, None)
-            return
-        
-        if edit_action == 'message':
-            if update_reminder(reminder_id, message=message_text):
-                update.message.reply_text("✅ Message updated! Use /list to see your reminders.")
-            else:
-                update.message.reply_text("❌ Failed to update reminder.")
-            context.user_data.pop(user_id, None)
-            return
-        
-        elif edit_action == 'time':
-            try:
-                # Try to parse the new time
-                user_timezone = pytz.timezone(get_user_timezone(user_id))
-                now = datetime.now(user_timezone)
-                
-                # Parse natural language time
-                parsed = ReminderParser.parse_natural_time(message_text, now)
-                new_time = datetime.combine(parsed['date'], parsed['time'])
-                new_time = user_timezone.localize(new_time)
-                
-                if new_time < now:
-                    if 'date' not in parsed:  # Only add a day if no specific date was set
-                        new_time += timedelta(days=1)
-                
-                if new_time < now:
-                    update.message.reply_text("❌ Cannot set reminder for past time.")
-                    return
-                
-                if update_reminder(reminder_id, reminder_time=new_time):
-                    # Reschedule the reminder
-                    if reminder_id in active_reminders:
-                        active_reminders[reminder_id].cancel()
-                        del active_reminders[reminder_id]
-                    
-                    schedule_reminder(
-                        context,
-                        update.message.chat_id,
-                        user_id,
-                        reminder_id,
-                        new_time,
-                        reminder['message'],
-                        reminder['priority'],
-                        reminder['recurrence_type'],
-                        reminder['recurrence_interval']
-                    )
-                    
-                    update.message.reply_text(
-                        f"✅ Time updated to {new_time.strftime('%I:%M %p on %d %b %Y')}!\n"
-                        "Use /list to see your reminders."
-                    )
-                else:
-                    update.message.reply_text("❌ Failed to update reminder.")
-            except Exception as e:
-                logger.error(f"Error updating reminder time: {str(e)}")
-                update.message.reply_text(
-                    "❌ Invalid time format. Please use formats like:\n"
-                    "• 3:00pm\n"
-                    "• 15:00\n"
-                    "• tomorrow 3pm\n"
-                    "• 25/02/2024 3:00pm"
-                )
-            context.user_data.pop(user_id, None)
+        if _handle_edit_input(update, context, user_id, message_text):
             return
     
     # Check for quick time buttons
     quick_time = None
     if message_text in QUICK_TIMES.values():
-        user_timezone = pytz.timezone(get_user_timezone(user_id))
+        _, user_timezone = get_user_timezone_cached(user_id)
         quick_time = process_quick_time(message_text, user_timezone)
         if quick_time:
             context.user_data[user_id] = {'quick_time': quick_time}
@@ -1064,144 +1590,34 @@ def handle_message(update: Update, context: CallbackContext) -> None:
             )
             return
     
-    # Handle reminder setting
-    if message_text.lower().startswith('reminder') or message_text.lower().startswith('remind'):
-        if not get_user_timezone(user_id):
+    # Handle reminder setting and the message that follows a quick time button
+    is_reminder = message_text.lower().startswith('reminder') or message_text.lower().startswith('remind')
+    if is_reminder or 'quick_time' in context.user_data.get(user_id, {}):
+        user_tz = get_user_timezone_cached(user_id)
+        if not user_tz:
             update.message.reply_text("Please set your time zone first using /timezone")
-        return
-
-    try:
-            user_timezone = pytz.timezone(get_user_timezone(user_id))
-            now = datetime.now(user_timezone)
-            
-            # Parse natural language if it doesn't follow the structured format
-            if 'time:' not in message_text and 'date:' not in message_text:
-                parsed = ReminderParser.parse_natural_time(message_text, now)
-                message_text = ReminderParser.format_reminder_text(parsed)
-            
-            reminders = parse_reminder(message_text)
-            if not reminders:
-                raise ValueError("No valid reminders found")
-            
-            for reminder in reminders:
-        # Parse the time
-                try:
-                    reminder_time = datetime.strptime(reminder['time'], '%I:%M%p')
-                except ValueError:
-                    try:
-                        reminder_time = datetime.strptime(reminder['time'], '%I:%M %p')
-                    except ValueError:
-                        reminder_time = datetime.strptime(reminder['time'], '%H:%M')
-                
-                # Parse the date if provided
-                if 'date' in reminder:
-                    try:
-                        reminder_date = datetime.strptime(reminder['date'], '%d/%m/%Y')
-                        reminder_time = reminder_time.replace(
-                            year=reminder_date.year,
-                            month=reminder_date.month,
-                            day=reminder_date.day
-                        )
-                    except ValueError:
-                        update.message.reply_text(f"❌ Invalid date format: {reminder['date']}. Use DD/MM/YYYY")
-                        continue
-                else:
-                    reminder_time = reminder_time.replace(
-                        year=now.year,
-                        month=now.month,
-                        day=now.day
-                    )
-                
-                reminder_time = user_timezone.localize(reminder_time)
-
-        # Schedule the reminder
-        if reminder_time < now:
-                    if 'date' not in reminder:  # Only add a day if no specific date was set
-                        reminder_time += timedelta(days=1)
-                
-                if reminder_time < now:
-                    update.message.reply_text(f"❌ Cannot set reminder for past time: {reminder['message']}")
-                    continue
-                
-                # Generate unique ID for the reminder
-                reminder_id = str(uuid.uuid4())[:8]
-                
-                # Get priority and recurrence
-                priority = reminder.get('priority', 'medium')
-                recurrence_type = reminder.get('recurrence_type')
-                recurrence_interval = reminder.get('recurrence_interval', 1)
-                
-                # Store reminder in persistent storage
-                save_reminder(
-                    user_id, reminder_id, reminder['message'], reminder_time,
-                    priority, recurrence_type, recurrence_interval
-                )
-                
-                # Schedule the reminder
-                schedule_reminder(
-                    context,
-                    update.message.chat_id,
-                    user_id,
-                    reminder_id,
-                    reminder_time,
-                    reminder['message'],
-                    priority,
-                    recurrence_type,
-                    recurrence_interval
-                )
-                
-                # Format response
-                priority_emoji = PRIORITY_EMOJIS.get(priority, '')
-                date_str = reminder_time.strftime('%d %b %Y')
-                time_str = reminder_time.strftime('%I:%M %p')
-                
-                response = f"{priority_emoji} Reminder set for {date_str} at {time_str}:\n{reminder['message']}"
-                
-                if recurrence_type:
-                    response += f"\n🔄 Repeats every {recurrence_interval} {recurrence_type}(s)"
-                
-                response += f"\nID: `{reminder_id}`"
-                
-                update.message.reply_text(
-                    response,
-                    parse_mode=ParseMode.MARKDOWN
-                )
-
-    except Exception as e:
-            logger.error(f"Error setting reminder: {str(e)}")
-            update.message.reply_text(
-                "❌ Error setting reminder. Use /format to see the correct format."
-            )
-    
-    # Handle quick time message
-    elif 'quick_time' in context.user_data.get(user_id, {}):
-        quick_time = context.user_data[user_id]['quick_time']
-        reminder_text = f"reminder\ntime: {quick_time['time'].strftime('%I:%M%p')}\n"
-        if quick_time['date'] != datetime.now().date():
-            reminder_text += f"date: {quick_time['date'].strftime('%d/%m/%Y')}\n"
-        reminder_text += message_text
-        
-        # Clear quick time data
-        del context.user_data[user_id]['quick_time']
+            return
         
-        # Process as normal reminder
-        update.message.text = reminder_text
-        handle_message(update, context)
-        return
+        # One clock read per message, shared by parsing, validation and formatting
+        _, user_timezone = user_tz
+        now = datetime.now(user_timezone)
+        if is_reminder:
+            _create_reminders(update, context, user_id, message_text, user_timezone, now)
+        else:
+            _handle_quick_time_followup(update, context, user_id, message_text, user_timezone, now)
     
     # Handle timezone setting
-    elif message_text in pytz.all_timezones:
+    elif message_text in _ALL_TZ_SET:
         set_user_timezone(user_id, message_text)
         update.message.reply_text(
             f"✅ Time zone set to {message_text}.\n\n"
             "You can now set reminders! Use /format to see reminder formats.",
-            reply_markup=get_quick_time_keyboard()
+            reply_markup=QUICK_TIME_KEYBOARD
         )
     else:
         # Check if it looks like a timezone attempt
         if '/' in message_text:
-            similar_timezones = [tz for tz in list(TIMEZONE_SUGGESTIONS.keys())[:4] 
-                               if tz.lower().startswith(message_text.split('/')[0].lower())]
+            similar_timezones = _TZ_PREFIX_INDEX.get(message_text.split('/')[0].lower())
             if similar_timezones:
                 keyboard = []
                 for tz in similar_timezones:
@@ -1215,33 +1631,37 @@ def handle_message(update: Update, context: CallbackContext) -> None:
         
         update.message.reply_text(
             "❌ Invalid message. Use /help to see available commands.",
-            reply_markup=get_quick_time_keyboard()
+            reply_markup=QUICK_TIME_KEYBOARD
         )
 
 def main() -> None:
     # Initialize database
     init_db()
     
+    # Start the reminder scheduler thread
+    scheduler.start()
+    
     # Start the keep_alive server
     keep_alive()
     
-    # Create the Updater with token from environment variable
-    updater = Updater(TELEGRAM_BOT_TOKEN)
+    # Create the Updater with token from environment variable; handlers run on
+    # its worker pool so one slow send or query never stalls the polling loop
+    updater = Updater(TELEGRAM_BOT_TOKEN, workers=BOT_WORKERS)
 
     # Get the dispatcher to register handlers
     dispatcher = updater.dispatcher
 
     # Register handlers
-    dispatcher.add_handler(CommandHandler("start", start))
-    dispatcher.add_handler(CommandHandler("help", help_command))
-    dispatcher.add_handler(CommandHandler("format", format_command))
-    dispatcher.add_handler(CommandHandler("timezone", timezone_command))
-    dispatcher.add_handler(CommandHandler("list", list_reminders))
-    dispatcher.add_handler(CommandHandler("cancel", cancel_reminder))
-    dispatcher.add_handler(CallbackQueryHandler(button_callback))
-    dispatcher.add_handler(MessageHandler(Filters.text & ~Filters.command, handle_message))
-    
-    # Handle missed reminders and schedule future ones
+    dispatcher.add_handler(CommandHandler("start", start, run_async=True))
+    dispatcher.add_handler(CommandHandler("help", help_command, run_async=True))
+    dispatcher.add_handler(CommandHandler("format", format_command, run_async=True))
+    dispatcher.add_handler(CommandHandler("timezone", timezone_command, run_async=True))
+    dispatcher.add_handler(CommandHandler("list", list_reminders, run_async=True))
+    dispatcher.add_handler(CommandHandler("cancel", cancel_reminder, run_async=True))
+    dispatcher.add_handler(CallbackQueryHandler(button_callback, run_async=True))
+    dispatcher.add_handler(MessageHandler(Filters.text & ~Filters.command, handle_message, run_async=True))
+    
+    # Re-arm pending reminders from the database and report missed ones
     handle_missed_reminders(updater.dispatcher)
 
     # Start the Bot
@@ -2,13 +2,37 @@ import sqlite3
 import sys
 from datetime import datetime
 
+def _split_statements(sql: str) -> list:
+    """Split a migration script into statements, keeping trigger bodies whole"""
+    statements = []
+    current = ''
+    for line in sql.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ''
+    # A final statement without a trailing semicolon still has to run
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
 def migrate():
     print("Running database migrations...")
     
+    conn = None
     try:
-        conn = sqlite3.connect('bot.db')
+        # Transactions are managed explicitly so all pending migrations commit together
+        conn = sqlite3.connect('bot.db', isolation_level=None)
         c = conn.cursor()
         
+        # Let cleanup reclaim space incrementally; only applies to a new database
+        c.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        
+        # WAL is persistent, so the bot's pooled connections find it already set;
+        # wait for a running bot's writes instead of failing with "database is locked"
+        c.execute('PRAGMA journal_mode=WAL')
+        c.execute('PRAGMA busy_timeout=20000')
+        
         # Create migration history table
         c.execute('''
             CREATE TABLE IF NOT EXISTS migrations (
@@ -102,16 +126,70 @@ def migrate():
                     SET reminder_count = reminder_count - 1
                     WHERE user_id = NEW.user_id;
                 END;
+            '''),
+            ('005_epoch_reminder_times', '''
+                -- Store reminder times as integer unix timestamps (UTC)
+                UPDATE reminders 
+                SET reminder_time = CAST(strftime('%s', reminder_time) AS INTEGER)
+                WHERE typeof(reminder_time) = 'text';
+            '''),
+            ('006_status_count_trigger', '''
+                -- Only fire the decrement trigger when status itself changes
+                DROP TRIGGER IF EXISTS update_reminder_count_delete;
+                
+                CREATE TRIGGER IF NOT EXISTS update_reminder_count_status
+                AFTER UPDATE OF status ON reminders
+                WHEN NEW.status != 'pending' AND OLD.status = 'pending'
+                BEGIN
+                    UPDATE users 
+                    SET reminder_count = reminder_count - 1
+                    WHERE user_id = NEW.user_id;
+                END;
+                
+                -- Resync counts for reminders created before the triggers existed
+                UPDATE users 
+                SET reminder_count = (
+                    SELECT COUNT(*) FROM reminders 
+                    WHERE reminders.user_id = users.user_id AND status = 'pending'
+                );
+            '''),
+            ('007_drop_reminder_count', '''
+                -- Pending counts come from idx_reminders_user_status on demand, so
+                -- inserts and status changes no longer also write to users.
+                -- users.reminder_count is left in place but unused: DROP COLUMN
+                -- needs SQLite 3.35+
+                DROP TRIGGER IF EXISTS update_reminder_count_insert;
+                DROP TRIGGER IF EXISTS update_reminder_count_status;
+            '''),
+            ('008_epoch_recurrence_end_dates', '''
+                -- Store recurrence end dates as unix timestamps (UTC), like reminder_time
+                UPDATE reminders 
+                SET recurrence_end_date = CAST(strftime('%s', recurrence_end_date) AS INTEGER)
+                WHERE typeof(recurrence_end_date) = 'text';
             ''')
         ]
         
-        # Apply new migrations
-        for name, sql in migrations:
-            if name not in applied:
-                print(f"Applying migration: {name}")
-                c.executescript(sql)
-                c.execute('INSERT INTO migrations (name) VALUES (?)', (name,))
-                conn.commit()
+        # Apply new migrations in one transaction; executescript would commit
+        # before every script, so statements are run one by one instead
+        pending = [(name, sql) for name, sql in migrations if name not in applied]
+        if pending:
+            # A single commit at the end is the only sync that matters
+            c.execute('PRAGMA synchronous=OFF')
+            c.execute('BEGIN IMMEDIATE')
+            try:
+                for name, sql in pending:
+                    print(f"Applying migration: {name}")
+                    for statement in _split_statements(sql):
+                        c.execute(statement)
+                    c.execute('INSERT INTO migrations (name) VALUES (?)', (name,))
+                c.execute('COMMIT')
+            except Exception:
+                c.execute('ROLLBACK')
+                raise
+            finally:
+                c.execute('PRAGMA synchronous=NORMAL')
+            
+            for name, _ in pending:
                 print(f"Applied migration: {name}")
         
         print("Migrations completed successfully.")
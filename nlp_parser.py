@@ -1,52 +1,102 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
 import re
 from typing import Dict, Optional, Tuple
 import calendar
 
+# Patterns used by parse_natural_time; the input is lowercased first
+_TIME_RE = re.compile(r'(?:at )?((?:1[0-2]|0?[1-9])(?::[0-5][0-9])?\s*(?:am|pm)|(?:[01]?[0-9]|2[0-3]):[0-5][0-9])')
+_WS_RE = re.compile(r'\s+')
+
+# Accepted clock formats, tried in order
+TIME_FORMATS = ('%I:%M%p', '%I:%M %p', '%H:%M', '%I%p', '%H')
+
+@lru_cache(maxsize=4096)
+def parse_time_string(value: str) -> time:
+    """Parse a clock time such as '9:00am', '3 pm' or '15:00'"""
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid time format: {value}")
+
+@lru_cache(maxsize=4096)
+def parse_date_string(value: str) -> date:
+    """Parse a DD/MM/YYYY date"""
+    return datetime.strptime(value, '%d/%m/%Y').date()
+
+# Keyword tables, kept at module scope so parsing never goes through the class
+_DAYS_OF_WEEK = {
+    'monday': 0, 'mon': 0,
+    'tuesday': 1, 'tue': 1,
+    'wednesday': 2, 'wed': 2,
+    'thursday': 3, 'thu': 3,
+    'friday': 4, 'fri': 4,
+    'saturday': 5, 'sat': 5,
+    'sunday': 6, 'sun': 6
+}
+
+_RELATIVE_DAYS = {
+    'today': 0,
+    'tomorrow': 1,
+    'tmr': 1,
+    'next week': 7,
+}
+
+_RELATIVE_TIMES = {
+    'morning': '9:00am',
+    'noon': '12:00pm',
+    'afternoon': '2:00pm',
+    'evening': '6:00pm',
+    'night': '8:00pm',
+    'tonight': '8:00pm',
+    'midnight': '12:00am',
+}
+
+_RECURRENCE_PATTERNS = {
+    'daily': ('day', 1),
+    'weekly': ('week', 1),
+    'monthly': ('month', 1),
+    'every day': ('day', 1),
+    'every week': ('week', 1),
+    'every month': ('month', 1),
+}
+
+_PRIORITY_KEYWORDS = {
+    'urgent': 'high',
+    'important': 'high',
+    'high': 'high',
+    'medium': 'medium',
+    'normal': 'medium',
+    'low': 'low',
+}
+
+# Every keyword mapped to the field it sets, matched as whole words, longest first,
+# in one pass after the custom 'every N days/weeks/months' recurrence
+_KEYWORDS = {
+    keyword: (kind, value)
+    for kind, table in (
+        ('priority', _PRIORITY_KEYWORDS),
+        ('recurrence', _RECURRENCE_PATTERNS),
+        ('time', _RELATIVE_TIMES),
+        ('day', _RELATIVE_DAYS),
+        ('weekday', _DAYS_OF_WEEK),
+    )
+    for keyword, value in table.items()
+}
+
+_KEYWORD_RE = re.compile(r'\b(?:every (?P<interval>\d+) (?P<unit>day|week|month)s?|' + '|'.join(
+    re.escape(keyword) for keyword in sorted(_KEYWORDS, key=len, reverse=True)
+) + r')\b')
+_NEXT_RE = re.compile(r'\bnext\b')
+
 class ReminderParser:
-    DAYS_OF_WEEK = {
-        'monday': 0, 'mon': 0,
-        'tuesday': 1, 'tue': 1,
-        'wednesday': 2, 'wed': 2,
-        'thursday': 3, 'thu': 3,
-        'friday': 4, 'fri': 4,
-        'saturday': 5, 'sat': 5,
-        'sunday': 6, 'sun': 6
-    }
-    
-    RELATIVE_DAYS = {
-        'today': 0,
-        'tomorrow': 1,
-        'tmr': 1,
-        'next week': 7,
-    }
-    
-    RELATIVE_TIMES = {
-        'morning': '9:00am',
-        'noon': '12:00pm',
-        'afternoon': '2:00pm',
-        'evening': '6:00pm',
-        'night': '8:00pm',
-        'midnight': '12:00am',
-    }
-    
-    RECURRENCE_PATTERNS = {
-        'daily': ('day', 1),
-        'weekly': ('week', 1),
-        'monthly': ('month', 1),
-        'every day': ('day', 1),
-        'every week': ('week', 1),
-        'every month': ('month', 1),
-    }
-    
-    PRIORITY_KEYWORDS = {
-        'urgent': 'high',
-        'important': 'high',
-        'high': 'high',
-        'medium': 'medium',
-        'normal': 'medium',
-        'low': 'low',
-    }
+    DAYS_OF_WEEK = _DAYS_OF_WEEK
+    RELATIVE_DAYS = _RELATIVE_DAYS
+    RELATIVE_TIMES = _RELATIVE_TIMES
+    RECURRENCE_PATTERNS = _RECURRENCE_PATTERNS
+    PRIORITY_KEYWORDS = _PRIORITY_KEYWORDS
 
     @classmethod
     def parse_natural_time(cls, text: str, current_time: datetime) -> Dict:
@@ -60,74 +110,53 @@ class ReminderParser:
             'message': text
         }
         
-        # Extract priority if present
-        for keyword, priority in cls.PRIORITY_KEYWORDS.items():
-            if keyword in text:
-                result['priority'] = priority
-                text = text.replace(keyword, '').strip()
-        
-        # Extract recurrence if present
-        for pattern, (rec_type, interval) in cls.RECURRENCE_PATTERNS.items():
-            if pattern in text:
-                result['recurrence_type'] = rec_type
-                result['recurrence_interval'] = interval
-                text = text.replace(pattern, '').strip()
-        
-        # Custom recurrence patterns
-        every_x_match = re.search(r'every (\d+) (day|week|month)s?', text)
-        if every_x_match:
-            interval, rec_type = every_x_match.groups()
-            result['recurrence_type'] = rec_type
-            result['recurrence_interval'] = int(interval)
-            text = text.replace(every_x_match.group(), '').strip()
+        # Extract and strip custom recurrences and every keyword in one pass;
+        # the first match of each kind wins
+        found = {}
+        def extract(match):
+            if match.group('interval'):
+                found.setdefault('every', (match.group('unit'), int(match.group('interval'))))
+            else:
+                kind, value = _KEYWORDS[match.group()]
+                found.setdefault(kind, value)
+            return ''
+        text = _KEYWORD_RE.sub(extract, text)
+        
+        if 'priority' in found:
+            result['priority'] = found['priority']
+        
+        # Custom recurrence patterns take precedence over the keywords
+        recurrence = found.get('every') or found.get('recurrence')
+        if recurrence:
+            result['recurrence_type'], result['recurrence_interval'] = recurrence
         
         # Try to find a time
-        time_match = re.search(r'(?:at )?((?:1[0-2]|0?[1-9])(?::[0-5][0-9])?\s*(?:am|pm)|(?:[01]?[0-9]|2[0-3]):[0-5][0-9])', text)
+        time_match = _TIME_RE.search(text)
         if time_match:
-            time_str = time_match.group(1)
             try:
-                if ':' not in time_str:
-                    time_str = time_str.replace(' ', '')
-                    if len(time_str) > 4:  # Has AM/PM
-                        result['time'] = datetime.strptime(time_str, '%I%p').time()
-                    else:
-                        result['time'] = datetime.strptime(time_str, '%H').time()
-                else:
-                    if 'am' in time_str.lower() or 'pm' in time_str.lower():
-                        result['time'] = datetime.strptime(time_str, '%I:%M%p').time()
-                    else:
-                        result['time'] = datetime.strptime(time_str, '%H:%M').time()
+                result['time'] = parse_time_string(time_match.group(1).replace(' ', ''))
             except ValueError:
                 pass
         
-        # Check for relative times
-        for rel_time, time_str in cls.RELATIVE_TIMES.items():
-            if rel_time in text:
-                result['time'] = datetime.strptime(time_str, '%I:%M%p').time()
-                text = text.replace(rel_time, '').strip()
-        
-        # Check for relative days
-        for rel_day, days_ahead in cls.RELATIVE_DAYS.items():
-            if rel_day in text:
-                result['date'] = current_time.date() + timedelta(days=days_ahead)
-                text = text.replace(rel_day, '').strip()
-                break
-        
-        # Check for day of week
-        for day_name, day_num in cls.DAYS_OF_WEEK.items():
-            if day_name in text:
-                current_day = current_time.weekday()
-                days_ahead = (day_num - current_day) % 7
-                if days_ahead == 0:
-                    days_ahead = 7  # Next week if same day
-                if 'next' in text:
-                    days_ahead += 7
-                result['date'] = current_time.date() + timedelta(days=days_ahead)
-                text = text.replace(day_name, '').strip()
-                break
+        # Relative times take precedence over an explicit time
+        if 'time' in found:
+            result['time'] = parse_time_string(found['time'])
+        
+        # Relative days, overridden by a day of the week
+        if 'day' in found:
+            result['date'] = current_time.date() + timedelta(days=found['day'])
+        
+        if 'weekday' in found:
+            current_day = current_time.weekday()
+            days_ahead = (found['weekday'] - current_day) % 7
+            if days_ahead == 0:
+                days_ahead = 7  # Next week if same day
+            if _NEXT_RE.search(text):
+                days_ahead += 7
+            result['date'] = current_time.date() + timedelta(days=days_ahead)
         
         # Clean up the message
-        result['message'] = re.sub(r'\s+', ' ', text).strip()
+        result['message'] = _WS_RE.sub(' ', text).strip()
         if not result['message']:
             result['message'] = "Reminder"
         
@@ -140,8 +169,8 @@ class ReminderParser:
         return result
 
     @classmethod
-    def format_reminder_text(cls, parsed: Dict) -> str:
-        """Convert parsed reminder back to bot format"""
+    def format_reminder_text(cls, parsed: Dict, today: date) -> str:
+        """Convert parsed reminder back to bot format, omitting the date when it is today"""
         reminder_text = "reminder\n"
         
         # Add priority if not medium
@@ -149,7 +178,7 @@ class ReminderParser:
             reminder_text += f"priority: {parsed['priority']}\n"
         
         # Add date if not today
-        if parsed['date'] != datetime.now().date():
+        if parsed['date'] != today:
             reminder_text += f"date: {parsed['date'].strftime('%d/%m/%Y')}\n"
         
         # Add time
@@ -162,4 +191,4 @@ class ReminderParser:
         # Add message
         reminder_text += parsed['message']
         
-        return reminder_text 
\ No newline at end of file
+        return reminder_text